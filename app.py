@@ -1,6 +1,7 @@
 # app.py (Updated)
 from flask import Flask, render_template, request, jsonify
-from main import run_analysis
+from main import run_analysis, verification_gate
+from request_coalescer import RequestCoalescer
 from models.behavioural_profiler import BehaviouralProfiler
 import tempfile
 import os
@@ -9,6 +10,12 @@ import pandas as pd
 
 app = Flask(__name__)
 
+# When profiles are maintained by profile_ingestor.py, /analyze only reads them
+STREAMING_PROFILES = os.environ.get("SENTINEL_PROFILE_INGEST", "request") == "stream"
+
+# Identical concurrent /analyze requests share one computation
+analysis_coalescer = RequestCoalescer(ttl_seconds=30.0)
+
 # --- Safely remove file with retry ---
 def safe_remove(path, retries=10, delay=0.5):
     for attempt in range(retries):
@@ -19,6 +26,10 @@ def safe_remove(path, retries=10, delay=0.5):
             time.sleep(delay)
     print(f"❌ Failed to delete temp file after {retries} retries: {path}")
 
+def _is_cacheable_result(result):
+    """A verdict degraded by the LLM budget reflects that moment's budget, not the content."""
+    return result.get('web_verification_status') != "degraded"
+
 # --- Route to render the main page ---
 @app.route("/")
 def index():
@@ -33,6 +44,9 @@ def analyze():
     This is the endpoint our JavaScript will call.
     """
     input_text = request.form.get("inputText", "")
+    author_id = request.form.get("authorId", "AmazonHelp")
+    gated_verification = request.form.get("gatedVerification", "false").lower() == "true"
+    priority = request.form.get("priority", 0, type=int)
     uploaded_file = request.files.get("file")
     temp_path = None
 
@@ -43,15 +57,32 @@ def analyze():
             uploaded_file.save(temp.name)
             temp_path = temp.name
 
-    # Run the time-consuming analysis
-    result = run_analysis(text=input_text, media_path=temp_path or "")
-
-    # Clean up the temporary file after analysis
-    if temp_path:
-        safe_remove(temp_path)
+    # Run the time-consuming analysis, sharing it with identical in-flight requests
+    try:
+        key = RequestCoalescer.make_key(input_text, temp_path or "", author_id,
+                                        extra=(gated_verification, priority))
+        result = analysis_coalescer.run(key, lambda: run_analysis(
+            text=input_text, media_path=temp_path or "", author_id=author_id,
+            gated_verification=gated_verification, priority=priority,
+            update_profiles=not STREAMING_PROFILES),
+            cacheable=_is_cacheable_result)
+    finally:
+        # Clean up the temporary file after analysis
+        if temp_path:
+            safe_remove(temp_path)
 
     return jsonify(result)
 
+@app.route("/verification_stats")
+def verification_stats():
+    """Reports how many web verifications were run, skipped or degraded by the gate."""
+    return jsonify(verification_gate.get_stats())
+
+@app.route("/coalescing_stats")
+def coalescing_stats():
+    """Reports how many /analyze requests were computed, coalesced or served from cache."""
+    return jsonify(analysis_coalescer.get_stats())
+
 @app.route("/profiler")
 def profiler_test_page():
     """Renders the dedicated test page for the behavioural profiler."""
@@ -74,10 +105,12 @@ def test_profiler_endpoint():
     profiler = BehaviouralProfiler(history_data_path="data/twcs.csv")
     
     # Call the new detailed method
-    detailed_result = profiler.analyze_and_explain(author_id, text, timestamp)
+    detailed_result = profiler.analyze_and_explain(author_id, text, timestamp,
+                                                   update_profile=not STREAMING_PROFILES)
     
-    # Save the updated profile state
-    profiler.save_profiles()
+    # Save the updated profile state (the ingestor owns writes in streaming mode)
+    if not STREAMING_PROFILES:
+        profiler.save_profiles()
     
     return jsonify(detailed_result)
 
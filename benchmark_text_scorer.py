@@ -0,0 +1,88 @@
+import random
+import time
+import numpy as np
+from models.textual_analyzer import preprocess_text, model, vectorizer, compiled_scorer
+from models.text_scorer import PARITY_TOLERANCE
+
+# This script checks that the compiled text scorer returns the same probabilities as
+# model.predict_proba and measures single-item latency for both scoring paths.
+
+SAMPLE_TEXT_PATH = "data/sample.txt"
+
+BUILTIN_SAMPLES = [
+    "Scientists confirm the new vaccine passed all phase three clinical trials.",
+    "BREAKING: Government secretly replaces all tap water with mind control chemicals!!!",
+    "The central bank raised interest rates by a quarter point on Wednesday.",
+    "You won't believe what this celebrity said about the moon landing hoax.",
+    "",
+]
+
+
+def load_samples(num_random=200, seed=42):
+    """Collects sample texts from data/ plus random documents built from the vocabulary."""
+    samples = list(BUILTIN_SAMPLES)
+    try:
+        with open(SAMPLE_TEXT_PATH, encoding="utf-8") as f:
+            samples.extend(line.strip() for line in f if line.strip())
+    except FileNotFoundError:
+        pass
+
+    rng = random.Random(seed)
+    vocabulary = list(vectorizer.vocabulary_.keys())
+    for _ in range(num_random):
+        length = rng.randint(1, 400)
+        samples.append(" ".join(rng.choice(vocabulary) for _ in range(length)))
+    return samples
+
+
+def check_parity(samples):
+    """Compares compiled and sklearn probabilities on every sample."""
+    max_diff = 0.0
+    for text in samples:
+        preprocessed_text = preprocess_text(text)
+        expected = model.predict_proba(vectorizer.transform([preprocessed_text]))[0][1]
+        actual = compiled_scorer.predict_proba(preprocessed_text)
+        max_diff = max(max_diff, abs(expected - actual))
+    return max_diff
+
+
+def time_single_item(preprocessed_samples, use_compiled, repeats=5):
+    """Returns per-call scoring latencies (in milliseconds) on single documents."""
+    latencies = []
+    for _ in range(repeats):
+        for preprocessed_text in preprocessed_samples:
+            start = time.perf_counter()
+            if use_compiled:
+                compiled_scorer.predict_proba(preprocessed_text)
+            else:
+                model.predict_proba(vectorizer.transform([preprocessed_text]))[0][1]
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    if not model or not vectorizer:
+        print("❌ Text model is not loaded. Nothing to benchmark.")
+        return
+    if not compiled_scorer:
+        print("❌ Text model could not be compiled. Nothing to benchmark.")
+        return
+
+    samples = load_samples()
+    print(f"--- Parity check on {len(samples)} documents ---")
+    max_diff = check_parity(samples)
+    print(f"   Max absolute difference: {max_diff:.3e}")
+    assert max_diff <= PARITY_TOLERANCE, f"Compiled scorer differs from predict_proba by {max_diff}"
+    print("✅ Compiled scorer matches model.predict_proba.")
+
+    # Preprocessing is shared by both paths, so only the scoring step is timed
+    print("--- Single-item scoring latency ---")
+    preprocessed_samples = [preprocess_text(text) for text in samples]
+    for label, use_compiled in (("sklearn", False), ("compiled", True)):
+        latencies = time_single_item(preprocessed_samples, use_compiled)
+        print(f"   {label:>8}: mean {latencies.mean():.3f} ms | "
+              f"p50 {np.percentile(latencies, 50):.3f} ms | p99 {np.percentile(latencies, 99):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import random
+import time
+from models import web_verifier
+
+# This script measures prompt size and latency of verify_with_web before and after the
+# prompt token budget, using a local stub in place of Gemini and the web search so no
+# network calls or API costs are involved.
+
+SAMPLE_TEXT_PATH = "data/sample.txt"
+STUB_BASE_LATENCY = 0.05        # Seconds of fixed latency per stub LLM call
+STUB_LATENCY_PER_TOKEN = 0.0002  # Seconds of latency per prompt token
+
+SENTENCES = [
+    "Officials announced a new policy on renewable energy subsidies on Monday.",
+    "The minister claimed that emissions fell by 40 percent over the last decade.",
+    "Critics argue the figures were taken from an unpublished internal report.",
+    "Several independent analysts said the data could not be verified.",
+    "The policy will cost an estimated 3 billion dollars over five years.",
+    "Opposition leaders called for a parliamentary inquiry into the numbers.",
+    "Residents in coastal towns expressed concern about rising energy bills.",
+    "A spokesperson later said the statistics would be published next month.",
+]
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Mimics llm_model.generate_content with latency proportional to prompt size."""
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, prompt):
+        tokens = web_verifier._count_tokens(prompt)
+        latency = STUB_BASE_LATENCY + STUB_LATENCY_PER_TOKEN * tokens
+        time.sleep(latency)
+        self.calls.append((tokens, latency))
+        if "identify up to 3 primary" in prompt:
+            return StubResponse("1. " + SENTENCES[1] + "\n2. " + SENTENCES[4] + "\n3. " + SENTENCES[0])
+        return StubResponse("- **Verdict:** **Insufficient Information**")
+
+
+def stub_search(query, max_results=3):
+    """
+    Returns max_results long snippets per query, like DDGS. The last snippet repeats the
+    first under another URL so the deduplication step has something to remove.
+    """
+    rng = random.Random(query)
+    results = []
+    for i in range(max_results):
+        if i > 0 and i == max_results - 1:
+            body = results[0]['body']
+        else:
+            body = " ".join(rng.choice(SENTENCES) for _ in range(12))
+        results.append({'title': f"Result {i+1}", 'href': f"https://example.com/{query[:20]}/{i}", 'body': body})
+    return results
+
+
+def load_article(num_sentences=400, seed=7):
+    """Uses data/sample.txt if present, otherwise builds a long synthetic article."""
+    try:
+        with open(SAMPLE_TEXT_PATH, encoding="utf-8") as f:
+            text = f.read().strip()
+        if text:
+            return text
+    except FileNotFoundError:
+        pass
+    rng = random.Random(seed)
+    return " ".join(rng.choice(SENTENCES) for _ in range(num_sentences))
+
+
+def run_case(article, token_budget, fused):
+    stub = StubModel()
+    web_verifier.llm_model = stub
+    start = time.perf_counter()
+    web_verifier.verify_with_web(article, token_budget=token_budget, fused=fused)
+    elapsed = time.perf_counter() - start
+    return stub.calls, elapsed
+
+
+def main():
+    web_verifier._search_duckduckgo = stub_search
+    article = load_article()
+    print(f"--- Article size: {web_verifier._count_tokens(article)} tokens ---")
+
+    cases = [
+        ("unbudgeted (before)", None, False),
+        ("budgeted", web_verifier.PROMPT_TOKEN_BUDGET, False),
+        ("budgeted + fused", web_verifier.PROMPT_TOKEN_BUDGET, True),
+    ]
+    for label, token_budget, fused in cases:
+        calls, elapsed = run_case(article, token_budget, fused)
+        prompt_tokens = [tokens for tokens, _ in calls]
+        print(f"   {label:>20}: {len(calls)} LLM calls | prompt tokens {prompt_tokens} "
+              f"(total {sum(prompt_tokens)}) | latency {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Local load-testing harness for the Flask service.
+# The app runs in-process on a real threaded werkzeug server inside a scratch copy of
+# assets/ and data/, so profile writes never touch the real online_profiles.joblib.
+# Gemini and web search are replaced with local stubs; every other model runs for real.
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIX = "analyze_text=5,analyze_audio=2,analyze_video=1,test_profiler=4"
+WORKLOAD_KINDS = ("analyze_text", "analyze_audio", "analyze_video", "test_profiler")
+STUB_LLM_LATENCY = 0.2      # Seconds per stubbed Gemini call
+STUB_SEARCH_LATENCY = 0.05  # Seconds per stubbed web search
+
+FALLBACK_TEXTS = [
+    "Scientists confirm the new vaccine passed all phase three clinical trials.",
+    "BREAKING: Government secretly replaces all tap water with mind control chemicals!!!",
+    "The central bank raised interest rates by a quarter point on Wednesday.",
+    "You won't believe what this celebrity said about the moon landing hoax.",
+]
+
+
+# --- Stubbed External Backends ---
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class _StubLLM:
+    def generate_content(self, prompt):
+        time.sleep(STUB_LLM_LATENCY)
+        if "identify up to 3 primary" in prompt:
+            return _StubResponse("1. First claim\n2. Second claim")
+        return _StubResponse("- **Verdict:** **Insufficient Information**")
+
+
+def _stub_search(query, max_results=3):
+    time.sleep(STUB_SEARCH_LATENCY)
+    return [{'title': f"Stub result {i+1}", 'href': f"https://example.com/{i}", 'body': query}
+            for i in range(max_results)]
+
+
+def prepare_workdir():
+    """Copies assets/, data/, templates/ and static/ into a scratch directory and enters it."""
+    workdir = tempfile.mkdtemp(prefix="sentinel_loadtest_")
+    for name in ("assets", "data", "templates", "static"):
+        source = os.path.join(PROJECT_DIR, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(workdir, name))
+
+    # The profiler needs a history file; an empty one makes every test author start fresh
+    history_path = os.path.join(workdir, "data", "twcs.csv")
+    if not os.path.exists(history_path):
+        os.makedirs(os.path.dirname(history_path), exist_ok=True)
+        with open(history_path, "w", encoding="utf-8") as f:
+            f.write("author_id,inbound,text,created_at\n")
+
+    os.chdir(workdir)
+    return workdir
+
+
+def start_server(port):
+    """Imports the app with stubbed backends and serves it on a background thread."""
+    sys.path.insert(0, PROJECT_DIR)
+    from werkzeug.serving import make_server
+    from models import web_verifier
+    import app as app_module
+
+    web_verifier.llm_model = _StubLLM()
+    web_verifier._search_duckduckgo = _stub_search
+
+    server = make_server("127.0.0.1", port, app_module.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+# --- HTTP Helpers ---
+
+def _encode_multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = b""
+    for name, value in fields.items():
+        body += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                 f"{value}\r\n").encode("utf-8")
+    for name, path in files.items():
+        with open(path, "rb") as f:
+            content = f.read()
+        body += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"; "
+                 f"filename=\"{os.path.basename(path)}\"\r\n"
+                 "Content-Type: application/octet-stream\r\n\r\n").encode("utf-8")
+        body += content + b"\r\n"
+    body += f"--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _post(url, body, content_type, timeout):
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+# --- Workload ---
+
+class Workload:
+    """Builds requests of each kind from the samples in data/."""
+    def __init__(self, base_url, timeout, unique_text):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.unique_text = unique_text
+        self.texts = self._load_texts()
+        self.audio_files = [os.path.join("data", f) for f in sorted(os.listdir("data"))
+                            if f.endswith((".wav", ".mp3"))]
+        self.video_files = [os.path.join("data", f) for f in sorted(os.listdir("data")) if f.endswith(".mp4")]
+
+    @staticmethod
+    def _load_texts():
+        try:
+            with open(os.path.join("data", "sample.txt"), encoding="utf-8") as f:
+                texts = [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            texts = []
+        return texts or FALLBACK_TEXTS
+
+    def _text(self, rng):
+        text = rng.choice(self.texts)
+        if self.unique_text:
+            text += f" [{uuid.uuid4().hex[:8]}]"
+        return text
+
+    def _analyze(self, rng, media_files):
+        files = {"file": rng.choice(media_files)} if media_files else {}
+        body, content_type = _encode_multipart({"inputText": self._text(rng)}, files)
+        return _post(f"{self.base_url}/analyze", body, content_type, self.timeout)
+
+    def analyze_text(self, rng):
+        return self._analyze(rng, [])
+
+    def analyze_audio(self, rng):
+        return self._analyze(rng, self.audio_files)
+
+    def analyze_video(self, rng):
+        return self._analyze(rng, self.video_files)
+
+    def test_profiler(self, rng, author_id=None, timestamp=None):
+        payload = {
+            "authorId": author_id or f"loadtest_author_{rng.randint(0, 9)}",
+            "text": self._text(rng),
+            "timestamp": timestamp or f"2017-11-01T{rng.randint(0, 23):02d}:00:00Z",
+        }
+        return _post(f"{self.base_url}/test_profiler", json.dumps(payload).encode("utf-8"),
+                     "application/json", self.timeout)
+
+
+def parse_mix(mix):
+    """Parses 'kind=weight,...' into a {kind: weight} dict, rejecting unknown kinds."""
+    weights = {}
+    for item in mix.split(","):
+        try:
+            kind, weight = item.split("=")
+            weights[kind.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid mix entry '{item}'; expected kind=weight")
+    unknown = sorted(set(weights) - set(WORKLOAD_KINDS))
+    if unknown:
+        raise ValueError(f"Unknown request kinds in mix: {', '.join(unknown)} "
+                         f"(expected any of: {', '.join(WORKLOAD_KINDS)})")
+    if not any(weight > 0 for weight in weights.values()):
+        raise ValueError("At least one request kind needs a positive weight")
+    return weights
+
+
+# --- Metrics ---
+
+def read_rss_mb():
+    """
+    Memory of this process (which hosts the app) in MB, as (value, is_current). Current
+    RSS comes from psutil or /proc; otherwise falls back to the peak RSS from getrusage.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024), True
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024, True
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return peak_mb, False
+
+
+class RSSSampler(threading.Thread):
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        while not self._stop_event.is_set():
+            rss_mb, is_current = read_rss_mb()
+            self.samples.append((time.perf_counter() - start, rss_mb, is_current))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _timed_call(fn, rng, scheduled_at):
+    """
+    Runs one request and returns (ok, latency). Latency is measured from the scheduled
+    arrival time, so time spent queued behind busy client threads is included.
+    """
+    try:
+        status, _ = fn(rng)
+        ok = status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return ok, time.perf_counter() - scheduled_at
+
+
+def run_load(workload, weights, rate, duration, concurrency, seed):
+    """
+    Open-loop load: requests arrive as a Poisson process at `rate` per second for
+    `duration` seconds and are served by up to `concurrency` client threads. Latencies
+    count from each request's scheduled arrival, including any wait for a free thread.
+    """
+    rng = random.Random(seed)
+    kinds = list(weights.keys())
+    kind_weights = [weights[k] for k in kinds]
+    futures = []
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        next_arrival = start
+        while next_arrival - start < duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            kind = rng.choices(kinds, weights=kind_weights)[0]
+            request_rng = random.Random(rng.random())
+            futures.append((kind, executor.submit(_timed_call, getattr(workload, kind), request_rng,
+                                                          next_arrival)))
+            next_arrival += rng.expovariate(rate)
+        results = [(kind, *future.result()) for kind, future in futures]
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def report_load(results, elapsed, rss_samples):
+    print(f"\n--- Load Results ({len(results)} requests in {elapsed:.1f} s) ---")
+    print(f"   Throughput: {len(results) / elapsed:.2f} req/s")
+    for kind in sorted({r[0] for r in results}) + ["all"]:
+        subset = [r for r in results if kind == "all" or r[0] == kind]
+        latencies = np.array([r[2] for r in subset]) * 1000
+        errors = sum(1 for r in subset if not r[1])
+        print(f"   {kind:>14}: n={len(subset):<5} error rate {errors / len(subset):6.1%} | "
+              f"p50 {np.percentile(latencies, 50):8.1f} ms | p95 {np.percentile(latencies, 95):8.1f} ms | "
+              f"p99 {np.percentile(latencies, 99):8.1f} ms | max {latencies.max():8.1f} ms")
+
+    if rss_samples and not rss_samples[0][2]:
+        print("--- Peak RSS Over Time (current RSS unavailable; install psutil) ---")
+    else:
+        print("--- RSS Over Time ---")
+    for t, rss, is_current in rss_samples:
+        label = "rss" if is_current else "peak rss"
+        print(f"   t={t:6.1f} s  {label}={rss:8.1f} MB")
+
+
+# --- Profile Consistency Check ---
+
+def check_profile_consistency(workload, num_authors, updates_per_author, concurrency, seed):
+    """
+    Sends updates_per_author concurrent /test_profiler calls for each of num_authors fresh
+    authors, then verifies the saved profile state: every successful update must be
+    counted exactly once and each profile must be internally consistent.
+    """
+    print(f"\n--- Profile Consistency Check ({num_authors} authors x {updates_per_author} updates) ---")
+    run_id = uuid.uuid4().hex[:6]
+    authors = [f"consistency_{run_id}_{i}" for i in range(num_authors)]
+    jobs = [(author, f"2017-11-01T{(i % 24):02d}:00:00Z") for author in authors for i in range(updates_per_author)]
+    random.Random(seed).shuffle(jobs)
+
+    def send(job):
+        author, timestamp = job
+        try:
+            status, body = workload.test_profiler(random.Random(), author_id=author, timestamp=timestamp)
+            return author, status == 200 and "error" not in json.loads(body)
+        except (urllib.error.URLError, OSError, ValueError):
+            return author, False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(send, jobs))
+
+    expected = {author: 0 for author in authors}
+    for author, ok in outcomes:
+        if ok:
+            expected[author] += 1
+    failed_requests = sum(1 for _, ok in outcomes if not ok)
+
+    try:
+        profiles = joblib.load(os.path.join("assets", "online_profiles.joblib"))
+    except Exception as e:
+        print(f"❌ Profile state file is corrupted and cannot be loaded: {e}")
+        return False
+
+    lost_updates = 0
+    corrupted = []
+    for author in authors:
+        profile = profiles.get(author)
+        stored = profile['total_tweets'] if profile else 0
+        lost_updates += max(expected[author] - stored, 0)
+        if profile and (stored > expected[author] or
+                        not np.all(np.isfinite(profile['feature_sums'])) or
+                        profile['hourly_counts'].sum() != stored):
+            corrupted.append(author)
+
+    print(f"   Failed requests: {failed_requests}")
+    print(f"   Lost updates: {lost_updates} of {sum(expected.values())} acknowledged")
+    print(f"   Corrupted profiles: {len(corrupted)}")
+    consistent = failed_requests == 0 and lost_updates == 0 and not corrupted
+    print("✅ Profile state is consistent." if consistent else "❌ Profile state is NOT consistent under concurrency.")
+    return consistent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load-testing harness for the Flask service.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Request mix weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--rate", type=float, default=5.0, help="Mean arrival rate in requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Load phase duration in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum concurrent client requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--unique-text", action="store_true", help="Make every text unique (defeats coalescing)")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument("--profile-authors", type=int, default=5, help="Authors used by the consistency check")
+    parser.add_argument("--profile-updates", type=int, default=10, help="Updates per author in the consistency check")
+    parser.add_argument("--skip-load", action="store_true", help="Only run the profile consistency check")
+    parser.add_argument("--port", type=int, default=0, help="Port to serve on (0 picks a free port)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the scratch copy for inspection")
+    args = parser.parse_args()
+
+    # Validate the mix before copying any files or starting the server
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    workdir = prepare_workdir()
+    print(f"-> Load test working directory: {workdir}")
+    server = None
+    rss_sampler = RSSSampler(args.rss_interval)
+    try:
+        server, base_url = start_server(args.port)
+        print(f"-> Serving app at {base_url}")
+        workload = Workload(base_url, args.timeout, args.unique_text)
+
+        rss_sampler.start()
+        if not args.skip_load:
+            results, elapsed = run_load(workload, weights, args.rate, args.duration,
+                                        args.concurrency, args.seed)
+        consistent = check_profile_consistency(workload, args.profile_authors, args.profile_updates,
+                                               args.concurrency, args.seed)
+    finally:
+        if rss_sampler.is_alive():
+            rss_sampler.stop()
+        if server is not None:
+            server.shutdown()
+        os.chdir(PROJECT_DIR)
+        if args.keep_workdir:
+            print(f"-> Keeping load test working directory: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if not args.skip_load:
+        report_load(results, elapsed, rss_sampler.samples)
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == "__main__":
+    main()
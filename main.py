@@ -1,7 +1,11 @@
 # main.py
 import json
+import os
+import time
 from engine import UnifiedHeuristicEngine
+from verification_gate import VerificationGate
 from models import analyze_text, analyze_visuals, trace_source, verify_with_web
+from models.web_verifier import estimate_verification_tokens
 from models.behavioural_profiler import BehaviouralProfiler
 from models.audio_analyzer import analyze_audio
 
@@ -43,9 +47,48 @@ def _parse_and_adjust_score(verdict, web_report, thresholds):
 
     return verdict
 
-def run_analysis(text, media_path="", author_id="AmazonHelp", timestamp="2017-11-01T10:30:00Z"):
+ALERT_THRESHOLDS = {'medium': 0.4, 'high': 0.75}
+
+# Gated web verification settings, overridable through environment variables
+UNCERTAINTY_BAND = float(os.environ.get("SENTINEL_UNCERTAINTY_BAND", 0.1))
+LLM_CALLS_PER_MINUTE = int(os.environ.get("SENTINEL_LLM_CALLS_PER_MINUTE", 20))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("SENTINEL_LLM_TOKENS_PER_MINUTE", 60000))
+
+# Shared across requests so the per-minute LLM budget applies to the whole process
+verification_gate = VerificationGate(thresholds=ALERT_THRESHOLDS, uncertainty_band=UNCERTAINTY_BAND,
+                                     max_calls_per_minute=LLM_CALLS_PER_MINUTE,
+                                     max_tokens_per_minute=LLM_TOKENS_PER_MINUTE)
+
+def _run_gated_verification(text, provisional_score, priority):
+    """
+    Runs web verification only for uncertain items and within the LLM budget.
+    Returns the report and a status string for the verdict.
+    """
+    if not verification_gate.needs_verification(provisional_score):
+        verification_gate.record_skip()
+        print("-> Provisional score is outside the uncertainty band. Skipping web verification.")
+        return "Web verification skipped: provisional score is outside the uncertainty band.", "skipped"
+
+    estimated_tokens = VerificationGate.estimate_tokens(estimate_verification_tokens(text))
+    decision = verification_gate.acquire(estimated_tokens, priority=priority)
+    if decision == 'degraded':
+        print("-> LLM budget exhausted. Skipping web verification.")
+        return "Web verification skipped: LLM call budget exhausted.", "degraded"
+
+    start = time.perf_counter()
+    report = verify_with_web(text)
+    verification_gate.record_verification(time.perf_counter() - start)
+    return report, "verified" if decision == 'run' else "queued"
+
+def run_analysis(text, media_path="", author_id="AmazonHelp", timestamp="2017-11-01T10:30:00Z",
+                 gated_verification=False, priority=0, update_profiles=True):
     """
     Run multi-modal analysis on the provided input.
+
+    With gated_verification, web verification only runs for items whose provisional
+    score is close to an alert threshold, subject to the per-minute LLM budget.
+    With update_profiles=False the behavioural profiles are only read; this is used
+    when profile_ingestor.py keeps them up to date from the message stream.
     """
     profiler = BehaviouralProfiler(history_data_path="data/twcs.csv", profile_state_path="assets/online_profiles.joblib")
 
@@ -54,8 +97,8 @@ def run_analysis(text, media_path="", author_id="AmazonHelp", timestamp="2017-11
     predicted_source_model = source_info['model_name']
 
     score_t = analyze_text(text)
-    score_b = profiler.analyze(author_id=author_id, new_text=text, new_timestamp=timestamp)
-    web_verification_report = verify_with_web(text)
+    score_b = profiler.analyze(author_id=author_id, new_text=text, new_timestamp=timestamp,
+                               update_profile=update_profiles)
 
     score_v = score_a = 0.0
     if media_path.endswith(".mp4"):
@@ -70,7 +113,7 @@ def run_analysis(text, media_path="", author_id="AmazonHelp", timestamp="2017-11
         'source': 0.20,
         'behavioural': 0.15
     }
-    alert_thresholds = {'medium': 0.4, 'high': 0.75}
+    alert_thresholds = ALERT_THRESHOLDS
     engine = UnifiedHeuristicEngine(weights=model_weights, thresholds=alert_thresholds)
 
     initial_verdict = engine.analyze_content(score_t, score_v, score_s, score_b, score_a)
@@ -82,10 +125,18 @@ def run_analysis(text, media_path="", author_id="AmazonHelp", timestamp="2017-11
         f"Behavioural Anomaly Score: {scores['behavioural']:.2f}"
     ]
     initial_verdict['reasoning'] = reasoning
+
+    if gated_verification:
+        web_verification_report, verification_status = _run_gated_verification(
+            text, initial_verdict['final_score'], priority)
+    else:
+        web_verification_report, verification_status = verify_with_web(text), "verified"
     initial_verdict['web_verification_report'] = web_verification_report
+    initial_verdict['web_verification_status'] = verification_status
     
     print("\n--- [Stage 2] Adjusting Score Based on Web Fact-Checking ---")
     final_verdict = _parse_and_adjust_score(initial_verdict, web_verification_report, alert_thresholds)
 
-    profiler.save_profiles()
+    if update_profiles:
+        profiler.save_profiles()
     return final_verdict
@@ -9,6 +9,8 @@ from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from nltk.tokenize import word_tokenize
 from scipy.spatial.distance import cosine
 import os
+import tempfile
+import threading
 
 try:
     nltk.data.find('tokenizers/punkt')
@@ -18,6 +20,14 @@ except LookupError:
     nltk.download('punkt', quiet=True)
     nltk.download('vader_lexicon', quiet=True)
 
+# Process-level cache of profiles built from history for read-only scoring, keyed by
+# (history path, author). In streaming mode nothing on the request path saves, so without
+# it every request for a not-yet-ingested author would re-read the whole history CSV.
+# Cached profiles are frozen (read-only arrays) and never stored in a profile_cache.
+_HISTORY_PROFILE_CACHE = {}
+_HISTORY_PROFILE_CACHE_LIMIT = 10000
+_history_profile_lock = threading.Lock()
+
 class BehaviouralProfiler:
     def __init__(self, history_data_path, profile_state_path='assets/online_profiles.joblib'):
         print("-> Initializing Online Behavioural Profiler...")
@@ -40,7 +50,18 @@ class BehaviouralProfiler:
     def save_profiles(self):
         print(f"-> Saving profile state to {self.profile_state_path}...")
         os.makedirs(os.path.dirname(self.profile_state_path), exist_ok=True)
-        joblib.dump(self.profile_cache, self.profile_state_path)
+        # Write to a unique temporary file and swap it in, so readers never see a partial
+        # file and concurrent saves from different threads never share a temp file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.profile_state_path) or ".",
+                                         suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                joblib.dump(self.profile_cache, f)
+            os.replace(temp_path, self.profile_state_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
         print("-> Save complete.")
     
     def _extract_stylometric_features(self, text):
@@ -66,6 +87,40 @@ class BehaviouralProfiler:
                 'mention_count': mention_count, 'hashtag_count': hashtag_count, 'sentiment': sentiment,
                 'uppercase_ratio': uppercase_ratio, 'exclamation_count': exclamation_count, 'question_count': question_count}
 
+    def _extract_stylometric_features_batch(self, texts):
+        """
+        Batch version of _extract_stylometric_features. Returns an (n, num_features) array
+        whose rows match the per-text feature dicts. Tokenization and sentiment still run per
+        text; the regex and character counts are vectorized over the batch.
+        """
+        texts = pd.Series([t if isinstance(t, str) else "" for t in texts], dtype=object)
+        if texts.empty:
+            return np.zeros((0, self.num_stylometric_features))
+        tokens = texts.map(word_tokenize)
+        lower_tokens = tokens.map(lambda words: [w.lower() for w in words])
+
+        word_count = tokens.map(len).to_numpy(dtype=float)
+        has_words = word_count > 0
+        safe_word_count = np.where(has_words, word_count, 1.0)
+
+        text_length = texts.str.len().to_numpy(dtype=float)
+        avg_word_length = lower_tokens.map(lambda words: np.mean([len(w) for w in words]) if words else 0).to_numpy(dtype=float)
+        ttr = lower_tokens.map(lambda words: len(set(words))).to_numpy(dtype=float) / safe_word_count
+        mention_count = texts.str.count(r'@\w+').to_numpy(dtype=float)
+        hashtag_count = texts.str.count(r'#\w+').to_numpy(dtype=float)
+        sentiment = np.array([self.sid.polarity_scores(t)['compound'] if ok else 0.0
+                              for t, ok in zip(texts, has_words)])
+        uppercase_count = tokens.map(lambda words: sum(1 for w in words if w.isupper() and len(w) > 1)).to_numpy(dtype=float)
+        uppercase_ratio = uppercase_count / safe_word_count
+        exclamation_count = texts.str.count('!').to_numpy(dtype=float)
+        question_count = texts.str.count(r'\?').to_numpy(dtype=float)
+
+        features = np.column_stack([text_length, word_count, avg_word_length, ttr, mention_count,
+                                    hashtag_count, sentiment, uppercase_ratio, exclamation_count, question_count])
+        # Texts without any tokens get an all-zero feature row, as in the per-text version
+        features[~has_words] = 0.0
+        return features
+
     def _create_empty_profile(self):
         return {
             'feature_sums': np.zeros(self.num_stylometric_features),
@@ -82,6 +137,68 @@ class BehaviouralProfiler:
             profile['hourly_counts'][hour] += 1
         profile['total_tweets'] += 1
 
+    def _aggregate_batch(self, author_ids, texts, timestamps):
+        """
+        Computes per-author feature sums, hour counts and tweet counts for a batch of tweets.
+        Returns (unique_authors, feature_sums, hourly_counts, tweet_counts).
+        """
+        features = self._extract_stylometric_features_batch(texts)
+        hours = np.array([pd.to_datetime(ts, errors='coerce').hour for ts in timestamps], dtype=float)
+        codes, unique_authors = pd.factorize(pd.Series(list(author_ids), dtype=object))
+
+        feature_sums = np.zeros((len(unique_authors), self.num_stylometric_features))
+        np.add.at(feature_sums, codes, features)
+        hourly_counts = np.zeros((len(unique_authors), 24))
+        valid_hours = ~np.isnan(hours)
+        np.add.at(hourly_counts, (codes[valid_hours], hours[valid_hours].astype(int)), 1)
+        tweet_counts = np.bincount(codes, minlength=len(unique_authors))
+        return unique_authors, feature_sums, hourly_counts, tweet_counts
+
+    def _apply_batch(self, profiles, author_ids, texts, timestamps):
+        """Adds a batch of tweets to the given author -> profile dict (profiles must exist)."""
+        unique_authors, feature_sums, hourly_counts, tweet_counts = self._aggregate_batch(author_ids, texts, timestamps)
+        for i, author_id in enumerate(unique_authors):
+            profile = profiles[author_id]
+            profile['feature_sums'] += feature_sums[i]
+            profile['hourly_counts'] += hourly_counts[i]
+            profile['total_tweets'] += int(tweet_counts[i])
+
+    def _build_profiles_from_history(self, author_ids):
+        """
+        Batch version of _build_profile_from_history: reads the history file once and builds
+        profiles for all the given authors. Returns None if the history file is missing.
+        """
+        print(f"-> Building initial profiles for {len(author_ids)} authors from history...")
+        try:
+            history_df = pd.read_csv(self.history_data_path)
+        except FileNotFoundError:
+            print(f"-> FATAL: Could not find history file at {self.history_data_path}")
+            return None
+        user_history = history_df[history_df['author_id'].isin(author_ids) & (history_df['inbound'] == False)]
+        profiles = {author_id: self._create_empty_profile() for author_id in author_ids}
+        if not user_history.empty:
+            self._apply_batch(profiles, user_history['author_id'].tolist(),
+                              user_history['text'].tolist(), user_history['created_at'].tolist())
+        print(f"-> Profiles built from {len(user_history)} historical tweets.")
+        return profiles
+
+    def update_profiles_batch(self, author_ids, texts, timestamps):
+        """
+        Applies a micro-batch of (author, text, timestamp) events to the profile cache with
+        the same arithmetic as _update_profile_with_tweet. Returns the number of authors updated.
+        """
+        if len(author_ids) == 0:
+            return 0
+        # Authors seen for the first time get their history loaded in a single CSV read
+        new_authors = list(dict.fromkeys(a for a in author_ids if a not in self.profile_cache))
+        if new_authors:
+            history_profiles = self._build_profiles_from_history(new_authors) or {}
+            for author_id in new_authors:
+                self.profile_cache[author_id] = history_profiles.get(author_id) or self._create_empty_profile()
+
+        self._apply_batch(self.profile_cache, author_ids, texts, timestamps)
+        return len(set(author_ids))
+
     def _build_profile_from_history(self, author_id):
         print(f"-> Building initial profile for '{author_id}' from history...")
         try:
@@ -99,6 +216,29 @@ class BehaviouralProfiler:
         print(f"-> Profile built for '{author_id}' from {len(user_history)} historical tweets.")
         return new_profile
 
+    def _get_read_only_history_profile(self, author_id):
+        """
+        Returns a frozen history-built profile from the process-level cache, building it
+        on first use. Used only for read-only scoring, so it is never updated or saved.
+        """
+        key = (os.path.abspath(self.history_data_path), author_id)
+        with _history_profile_lock:
+            profile = _HISTORY_PROFILE_CACHE.get(key)
+        if profile is not None:
+            return profile
+
+        profile = self._build_profile_from_history(author_id)
+        if profile is None:
+            return None
+        profile['feature_sums'].setflags(write=False)
+        profile['hourly_counts'].setflags(write=False)
+        with _history_profile_lock:
+            # Drop the oldest entry once the cache is full
+            if len(_HISTORY_PROFILE_CACHE) >= _HISTORY_PROFILE_CACHE_LIMIT:
+                del _HISTORY_PROFILE_CACHE[next(iter(_HISTORY_PROFILE_CACHE))]
+            _HISTORY_PROFILE_CACHE.setdefault(key, profile)
+        return profile
+
     def _get_live_profile_vector(self, profile):
         if profile['total_tweets'] == 0:
             return None
@@ -107,16 +247,21 @@ class BehaviouralProfiler:
         return np.concatenate([mean_stylometric_vector, mean_temporal_vector])
 
     # --- NEW: Detailed analysis method for testing ---
-    def analyze_and_explain(self, author_id, new_text, new_timestamp):
+    def analyze_and_explain(self, author_id, new_text, new_timestamp, update_profile=True):
         """
         Performs a full analysis and returns a detailed dictionary for inspection.
+        With update_profile=False the profile cache is left untouched (read-only scoring).
         """
         print(f"-> Running DETAILED behavioural profiling for '{author_id}'...")
         
         if author_id not in self.profile_cache:
-            profile = self._build_profile_from_history(author_id)
-            if profile is None: return {"error": "History file not found."}
-            self.profile_cache[author_id] = profile
+            if update_profile:
+                profile = self._build_profile_from_history(author_id)
+                if profile is None: return {"error": "History file not found."}
+                self.profile_cache[author_id] = profile
+            else:
+                profile = self._get_read_only_history_profile(author_id)
+                if profile is None: return {"error": "History file not found."}
         else:
             profile = self.profile_cache[author_id]
 
@@ -149,7 +294,8 @@ class BehaviouralProfiler:
                 'temporal': list(new_content_vector[self.num_stylometric_features:].round(4))
             }
         
-        self._update_profile_with_tweet(profile, new_text, new_timestamp)
+        if update_profile:
+            self._update_profile_with_tweet(profile, new_text, new_timestamp)
         
         return {
             'author_id': author_id,
@@ -158,11 +304,11 @@ class BehaviouralProfiler:
         }
 
     # --- ORIGINAL: Simplified method for the main pipeline ---
-    def analyze(self, author_id, new_text, new_timestamp):
+    def analyze(self, author_id, new_text, new_timestamp, update_profile=True):
         """
         Public method for the main pipeline. Returns only the anomaly score.
         This ensures backward compatibility with main.py.
         """
         # This method now calls the detailed one and extracts just the score
-        result = self.analyze_and_explain(author_id, new_text, new_timestamp)
+        result = self.analyze_and_explain(author_id, new_text, new_timestamp, update_profile=update_profile)
         return result.get('anomaly_score', 0.5) # Return 0.5 if there was an error
\ No newline at end of file
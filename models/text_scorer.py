@@ -0,0 +1,139 @@
+import math
+import random
+from collections import Counter
+from sklearn.linear_model import LogisticRegression
+
+# --- Compiled Sparse Linear Scorer for the Text Model ---
+# For a single document the generic sklearn path (vectorizer.transform followed by
+# model.predict_proba) spends most of its time building sparse matrices and validating
+# inputs. Because the text model is TF-IDF + Logistic Regression, the whole pipeline can
+# be folded into one term -> weight table, so scoring is a dict lookup per token, a sum,
+# and a sigmoid.
+
+
+# Maximum allowed difference from model.predict_proba in the load-time self-check
+PARITY_TOLERANCE = 1e-9
+
+
+class CompiledTextScorer:
+    """
+    Scores preprocessed text with the same arithmetic as the TF-IDF vectorizer and
+    binary Logistic Regression model it was compiled from.
+
+    For every vocabulary term the table stores (idf, idf * coef). The TF-IDF row is
+    normalised before it reaches the model, so the decision value is:
+
+        z = sum(tf * idf * coef) / norm(tf * idf) + intercept
+    """
+    def __init__(self, analyzer, term_table, intercept, norm='l2', sublinear_tf=False, binary=False):
+        self.analyzer = analyzer
+        self.term_table = term_table
+        self.intercept = intercept
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+
+    def decision_function(self, preprocessed_text):
+        """Returns the raw linear score (log-odds of the FAKE class)."""
+        counts = Counter(self.analyzer(preprocessed_text))
+
+        weighted_sum = 0.0
+        norm_accumulator = 0.0
+        for term, count in counts.items():
+            entry = self.term_table.get(term)
+            if entry is None:
+                continue
+            idf, weight = entry
+            if self.binary:
+                tf = 1.0
+            elif self.sublinear_tf:
+                tf = 1.0 + math.log(count)
+            else:
+                tf = float(count)
+            weighted_sum += tf * weight
+            if self.norm == 'l2':
+                norm_accumulator += (tf * idf) ** 2
+            elif self.norm == 'l1':
+                norm_accumulator += abs(tf * idf)
+
+        if self.norm == 'l2' and norm_accumulator > 0.0:
+            weighted_sum /= math.sqrt(norm_accumulator)
+        elif self.norm == 'l1' and norm_accumulator > 0.0:
+            weighted_sum /= norm_accumulator
+
+        return weighted_sum + self.intercept
+
+    def predict_proba(self, preprocessed_text):
+        """Returns the probability of the FAKE class (index 1), matching model.predict_proba."""
+        z = self.decision_function(preprocessed_text)
+        # Numerically stable sigmoid, same as scipy.special.expit used by sklearn
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        exp_z = math.exp(z)
+        return exp_z / (1.0 + exp_z)
+
+
+def compile_text_scorer(vectorizer, model):
+    """
+    Builds a CompiledTextScorer from a fitted TfidfVectorizer and a fitted binary
+    LogisticRegression.
+
+    Returns None if the pair cannot be compiled exactly, or if the compiled scorer fails
+    the parity self-check, in which case callers should fall back to the regular sklearn path.
+    """
+    # Other linear classifiers (e.g. SGDClassifier) do not use a sigmoid in predict_proba
+    if not isinstance(model, LogisticRegression):
+        return None
+
+    coef = getattr(model, 'coef_', None)
+    intercept = getattr(model, 'intercept_', None)
+    vocabulary = getattr(vectorizer, 'vocabulary_', None)
+    if coef is None or intercept is None or vocabulary is None:
+        return None
+
+    # Only binary models have a single coefficient row and a sigmoid link
+    if coef.shape[0] != 1 or len(getattr(model, 'classes_', [])) != 2:
+        return None
+    if getattr(model, 'multi_class', 'auto') == 'multinomial':
+        return None
+    if getattr(vectorizer, 'norm', 'l2') not in ('l2', 'l1', None):
+        return None
+
+    coef_row = coef[0]
+    if hasattr(coef_row, 'toarray'):
+        coef_row = coef_row.toarray().ravel()
+
+    if getattr(vectorizer, 'use_idf', True):
+        idf = vectorizer.idf_
+    else:
+        idf = [1.0] * len(vocabulary)
+
+    term_table = {
+        term: (float(idf[index]), float(idf[index]) * float(coef_row[index]))
+        for term, index in vocabulary.items()
+    }
+
+    scorer = CompiledTextScorer(
+        analyzer=vectorizer.build_analyzer(),
+        term_table=term_table,
+        intercept=float(intercept[0]),
+        norm=getattr(vectorizer, 'norm', 'l2'),
+        sublinear_tf=getattr(vectorizer, 'sublinear_tf', False),
+        binary=getattr(vectorizer, 'binary', False),
+    )
+    if not _passes_parity_check(scorer, vectorizer, model, list(vocabulary)):
+        return None
+    return scorer
+
+
+def _passes_parity_check(scorer, vectorizer, model, terms, num_documents=8):
+    """Compares the compiled scorer with model.predict_proba on a few vocabulary documents."""
+    rng = random.Random(0)
+    documents = [""] + [" ".join(rng.choice(terms) for _ in range(rng.randint(1, 50)))
+                        for _ in range(num_documents)]
+    expected = model.predict_proba(vectorizer.transform(documents))[:, 1]
+    for document, expected_probability in zip(documents, expected):
+        if abs(scorer.predict_proba(document) - expected_probability) > PARITY_TOLERANCE:
+            print("-> Compiled text scorer failed the parity check against predict_proba.")
+            return False
+    return True
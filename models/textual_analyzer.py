@@ -4,6 +4,7 @@ import os
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import word_tokenize
+from .text_scorer import compile_text_scorer
 
 # --- Efficiently Load Model and Vectorizer Once ---
 
@@ -22,10 +23,18 @@ try:
     lemmatizer = WordNetLemmatizer()
     stop_words = set(stopwords.words('english'))
 
+    # Fold vocabulary, IDF weights and coefficients into a single lookup table
+    compiled_scorer = compile_text_scorer(vectorizer, model)
+    if compiled_scorer:
+        print("✅ Compiled text scorer built successfully.")
+    else:
+        print("-> Text model cannot be compiled. Using the sklearn scoring path.")
+
 except FileNotFoundError:
     print("❌ Error: Model or vectorizer file not found. Make sure the 'assets' directory is correctly placed.")
     model = None
     vectorizer = None
+    compiled_scorer = None
 
 # --- Preprocessing Function from our Notebook ---
 
@@ -39,10 +48,13 @@ def preprocess_text(text):
 
 # --- Main Analysis Function ---
 
-def analyze_text(text_content):
+def analyze_text(text_content, use_compiled=True):
     """
     Analyzes text content using the loaded TF-IDF and Logistic Regression model.
     Returns the probability of the text being FAKE (malicious).
+
+    When use_compiled is True and a compiled scorer is available, the score is
+    computed from the compiled term table instead of the sklearn pipeline.
     """
     print("-> Running real-time textual analysis...")
     
@@ -52,6 +64,10 @@ def analyze_text(text_content):
 
     # 1. Preprocess the input text
     preprocessed_text = preprocess_text(text_content)
+
+    # Fast path: hash lookups and a sigmoid, identical to the sklearn result
+    if use_compiled and compiled_scorer:
+        return compiled_scorer.predict_proba(preprocessed_text)
     
     # 2. Transform the text using the loaded vectorizer
     vectorized_text = vectorizer.transform([preprocessed_text])
@@ -19,16 +19,94 @@ else:
     # Initialize the model only if configuration is successful
     llm_model = genai.GenerativeModel('gemini-2.5-pro')
 
-def _extract_key_claims(article_text: str) -> list[str]:
+# --- Prompt Budget Configuration ---
+# Token counts are estimated locally (~4 characters per token for Gemini) so that
+# prompt size can be bounded without an extra API round trip.
+CHARS_PER_TOKEN = 4
+PROMPT_TOKEN_BUDGET = 4000      # Total budget for the article + evidence in one prompt
+ARTICLE_BUDGET_SHARE = 0.4      # Share of the budget reserved for the article text
+SNIPPETS_PER_CLAIM = 3          # Maximum evidence snippets kept per claim
+DUPLICATE_SIMILARITY = 0.8      # Word-set Jaccard above which two snippets are duplicates
+
+_STOPWORDS = {
+    'the', 'and', 'for', 'that', 'with', 'this', 'from', 'are', 'was', 'were', 'has', 'have',
+    'had', 'not', 'but', 'his', 'her', 'its', 'they', 'their', 'been', 'will', 'would', 'said',
+    'which', 'who', 'what', 'when', 'where', 'into', 'than', 'then', 'also', 'about', 'after',
+}
+
+
+def _count_tokens(text: str) -> int:
+    """Estimates the number of LLM tokens in a string."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _content_words(text: str) -> list[str]:
+    """Lowercased content words used for relevance scoring and deduplication."""
+    return [w for w in re.findall(r'[a-z0-9]+', text.lower()) if len(w) > 2 and w not in _STOPWORDS]
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Hard-truncates text to at most max_tokens, including the " ..." marker, cutting at a word boundary."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    marker = " ..."
+    if max_chars <= len(marker):
+        return ""
+    return text[:max_chars - len(marker)].rsplit(' ', 1)[0] + marker
+
+
+def _rank_sentences(article_text: str) -> list[tuple[int, float, str]]:
     """
-    Uses the LLM to perform a preliminary pass to extract the main, verifiable claims.
+    Scores each sentence by the average frequency of its content words within the article,
+    with a small bonus for leading sentences. Returns (position, score, sentence) tuples.
     """
-    if not llm_model:
-        return []
-    
-    print("-> Step 1: Extracting key claims from article...")
-    
-    prompt = f"""
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', article_text.strip()) if s.strip()]
+    frequencies = {}
+    for word in _content_words(article_text):
+        frequencies[word] = frequencies.get(word, 0) + 1
+
+    ranked = []
+    for position, sentence in enumerate(sentences):
+        words = _content_words(sentence)
+        score = sum(frequencies[w] for w in words) / len(words) if words else 0.0
+        score *= 1.0 + 0.5 / (position + 1)
+        ranked.append((position, score, sentence))
+    return ranked
+
+
+def _summarize_article(article_text: str, max_tokens: int | None) -> str:
+    """
+    Returns the article unchanged if it fits the budget, otherwise an extractive summary
+    of its highest-scoring sentences kept in their original order.
+    """
+    if max_tokens is None or _count_tokens(article_text) <= max_tokens:
+        return article_text
+
+    selected = []
+    seen_sentences = set()
+    used_tokens = 0
+    for position, _, sentence in sorted(_rank_sentences(article_text), key=lambda r: r[1], reverse=True):
+        sentence_tokens = _count_tokens(sentence) + 1
+        if sentence in seen_sentences or used_tokens + sentence_tokens > max_tokens:
+            continue
+        selected.append((position, sentence))
+        seen_sentences.add(sentence)
+        used_tokens += sentence_tokens
+
+    if not selected:
+        # A single sentence is longer than the whole budget
+        return _truncate_to_tokens(article_text, max_tokens)
+    return " ".join(sentence for _, sentence in sorted(selected))
+
+
+def _extractive_claims(article_text: str, max_claims: int = 3) -> list[str]:
+    """Picks the most central sentences as search queries without calling the LLM."""
+    ranked = sorted(_rank_sentences(article_text), key=lambda r: r[1], reverse=True)[:max_claims]
+    return [_truncate_to_tokens(sentence, 60) for _, _, sentence in sorted(ranked)]
+
+
+_CLAIM_EXTRACTION_PROMPT = """
     You are an analytical assistant. Read the following news article and identify up to 3 primary, verifiable claims it is making. List them concisely as a numbered list.
 
     Article:
@@ -41,6 +119,18 @@ def _extract_key_claims(article_text: str) -> list[str]:
     2. [Second claim]
     ...
     """
+
+
+def _extract_key_claims(article_text: str) -> list[str]:
+    """
+    Uses the LLM to perform a preliminary pass to extract the main, verifiable claims.
+    """
+    if not llm_model:
+        return []
+    
+    print("-> Step 1: Extracting key claims from article...")
+    
+    prompt = _CLAIM_EXTRACTION_PROMPT.format(article_text=article_text)
     
     try:
         response = llm_model.generate_content(prompt)
@@ -56,32 +146,78 @@ def _extract_key_claims(article_text: str) -> list[str]:
         return [" ".join(article_text.split()[:50])]
 
 
-def _search_duckduckgo(query: str, max_results: int = 3) -> str:
-    """Performs a web search and formats results for the LLM."""
+def _search_duckduckgo(query: str, max_results: int = 3) -> list[dict]:
+    """Performs a web search and returns the raw results (title, href, body)."""
     print(f"-> Performing web search for: '{query[:75]}...'")
     try:
         with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-        if not results:
-            return f"No search results found for the query: '{query}'.\n\n"
-        
-        context = f"Evidence found for claim '{query}':\n"
-        for i, result in enumerate(results):
-            context += f"  Source {i+1} (Title: {result['title']}):\n"
-            context += f"    URL: {result['href']}\n"
-            context += f"    Snippet: {result['body']}\n\n"
-        return context
+            return list(ddgs.text(query, max_results=max_results))
     except Exception as e:
-        return f"An error occurred during web search for '{query}': {e}\n\n"
+        print(f"   An error occurred during web search for '{query}': {e}")
+        return []
 
 
-def _synthesize_with_llm(aggregated_context: str, article_text: str) -> str:
-    """Uses the LLM to perform a final, detailed analysis."""
-    if not llm_model:
-        return "LLM model not available due to configuration error."
+def _rank_snippets(claim: str, results: list[dict], seen_snippets: list[tuple[str, set]]) -> list[dict]:
+    """
+    Orders search results by word overlap with the claim and drops results that repeat
+    a URL or near-duplicate a snippet already kept for another claim.
+    """
+    claim_words = set(_content_words(claim))
+    scored = []
+    for result in results:
+        body_words = set(_content_words(result.get('body', '')))
+        overlap = len(claim_words & body_words) / len(claim_words) if claim_words else 0.0
+        scored.append((overlap, result, body_words))
+    scored.sort(key=lambda item: item[0], reverse=True)
 
-    print("-> Step 3: Synthesizing all evidence for a final verdict...")
-    prompt = f"""
+    ranked = []
+    for _, result, body_words in scored:
+        is_duplicate = False
+        for href, words in seen_snippets:
+            union = body_words | words
+            if result.get('href') == href or (union and len(body_words & words) / len(union) >= DUPLICATE_SIMILARITY):
+                is_duplicate = True
+                break
+        if is_duplicate:
+            continue
+        seen_snippets.append((result.get('href'), body_words))
+        ranked.append(result)
+    return ranked[:SNIPPETS_PER_CLAIM]
+
+
+def _build_evidence_context(claims: list[str], search_results: list[list[dict]], max_tokens: int | None) -> str:
+    """
+    Formats the ranked evidence for each claim, giving every claim an equal share of the
+    evidence budget. Everything written for a claim (headers, snippets, truncation markers
+    and "no results" lines) counts against its share.
+    """
+    per_claim_tokens = max_tokens // max(len(claims), 1) if max_tokens is not None else None
+    seen_snippets = []
+    context = ""
+    for claim, results in zip(claims, search_results):
+        if not results:
+            section = f"No search results found for the query: '{claim}'.\n\n"
+        else:
+            ranked = results if max_tokens is None else _rank_snippets(claim, results, seen_snippets)
+            section = f"Evidence found for claim '{claim}':\n"
+            for i, result in enumerate(ranked):
+                entry_prefix = f"  Source {i+1} (Title: {result['title']}):\n    URL: {result['href']}\n    Snippet: "
+                body = result['body']
+                if per_claim_tokens is not None:
+                    remaining = per_claim_tokens - _count_tokens(section + entry_prefix + "\n\n")
+                    if remaining <= 0:
+                        break
+                    body = _truncate_to_tokens(body, remaining)
+                section += entry_prefix + body + "\n\n"
+
+        # A very long claim can push its header or "no results" line over the share on its own
+        if per_claim_tokens is not None and _count_tokens(section) > per_claim_tokens:
+            section = _truncate_to_tokens(section, per_claim_tokens)
+        context += section
+    return context
+
+
+_SYNTHESIS_PROMPT = """
     You are a meticulous, impartial fact-checker. Your task is to provide a final, reasoned analysis of an original article based on aggregated web evidence.
 
     **Original Article:**
@@ -104,6 +240,15 @@ def _synthesize_with_llm(aggregated_context: str, article_text: str) -> str:
     - **Verdict:** [**Corroborated** / **Strongly Contradicted** / **Partially Contradicted** / **Insufficient Information**]
     - **Reasoning:** [A concise, one-paragraph explanation of your conclusion. Reference specific sources (e.g., "Source 1," "Source 4") to support your reasoning.]
     """
+
+
+def _synthesize_with_llm(aggregated_context: str, article_text: str) -> str:
+    """Uses the LLM to perform a final, detailed analysis."""
+    if not llm_model:
+        return "LLM model not available due to configuration error."
+
+    print("-> Step 3: Synthesizing all evidence for a final verdict...")
+    prompt = _SYNTHESIS_PROMPT.format(article_text=article_text, aggregated_context=aggregated_context)
     
     try:
         response = llm_model.generate_content(prompt)
@@ -111,23 +256,111 @@ def _synthesize_with_llm(aggregated_context: str, article_text: str) -> str:
     except Exception as e:
         return f"An error occurred while generating the LLM response: {e}"
 
+
+_FUSED_PROMPT = """
+    You are a meticulous, impartial fact-checker. Your task is to identify the key claims of an original article and provide a final, reasoned analysis of them based on aggregated web evidence.
+
+    **Original Article:**
+    ---
+    {article_text}
+    ---
+
+    **Aggregated Web Evidence (from searches on the article's central sentences):**
+    ---
+    {aggregated_context}
+    ---
+
+    **Your Analysis Task (Think Step-by-Step):**
+    1.  **Identify Claims:** List up to 3 primary, verifiable claims made by the **Original Article**.
+    2.  **Evaluate Sources:** Briefly comment on the likely reliability of the retrieved sources.
+    3.  **Analyze Evidence vs. Claims:** Does the evidence support, contradict, or is it unrelated to each claim?
+    4.  **Formulate Final Verdict:** Provide a clear, final verdict based on your analysis.
+
+    **Final Output Format:**
+    - **Key Claims:** [Numbered list of the claims.]
+    - **Evidence Reliability Assessment:** [Your brief assessment of the sources' credibility.]
+    - **Verdict:** [**Corroborated** / **Strongly Contradicted** / **Partially Contradicted** / **Insufficient Information**]
+    - **Reasoning:** [A concise, one-paragraph explanation of your conclusion. Reference specific sources (e.g., "Source 1," "Source 4") to support your reasoning.]
+    """
+
+
+def _extract_and_synthesize_with_llm(aggregated_context: str, article_text: str) -> str:
+    """
+    Fused mode: a single LLM call that identifies the article's key claims and judges
+    them against evidence retrieved for locally extracted claim sentences.
+    """
+    if not llm_model:
+        return "LLM model not available due to configuration error."
+
+    print("-> Extracting claims and synthesizing evidence in a single pass...")
+    prompt = _FUSED_PROMPT.format(article_text=article_text, aggregated_context=aggregated_context)
+
+    try:
+        response = llm_model.generate_content(prompt)
+        return response.text
+    except Exception as e:
+        return f"An error occurred while generating the LLM response: {e}"
+
+def _split_budget(token_budget: int | None) -> tuple[int | None, int | None]:
+    """Splits the prompt budget into (article budget, evidence budget)."""
+    if token_budget is None:
+        return None, None
+    article_budget = int(token_budget * ARTICLE_BUDGET_SHARE)
+    return article_budget, token_budget - article_budget
+
+
+def estimate_verification_tokens(article_text: str, token_budget: int | None = PROMPT_TOKEN_BUDGET,
+                                 fused: bool = False) -> int:
+    """
+    Estimates the total prompt tokens verify_with_web will send for this article: the
+    (capped) article in every prompt, the full evidence share in the synthesis prompt,
+    and each prompt template's own text. Without a budget, the evidence is charged at
+    the default evidence share.
+    """
+    article_budget, evidence_budget = _split_budget(token_budget)
+    article_tokens = _count_tokens(article_text)
+    if article_budget is not None:
+        article_tokens = min(article_tokens, article_budget)
+    if evidence_budget is None:
+        evidence_budget = _split_budget(PROMPT_TOKEN_BUDGET)[1]
+
+    if fused:
+        template_tokens = _count_tokens(_FUSED_PROMPT.format(article_text="", aggregated_context=""))
+        return template_tokens + article_tokens + evidence_budget
+
+    claim_tokens = _count_tokens(_CLAIM_EXTRACTION_PROMPT.format(article_text="")) + article_tokens
+    synthesis_tokens = (_count_tokens(_SYNTHESIS_PROMPT.format(article_text="", aggregated_context=""))
+                        + article_tokens + evidence_budget)
+    return claim_tokens + synthesis_tokens
+
 # --- Main Public Function ---
-def verify_with_web(article_text: str):
+def verify_with_web(article_text: str, token_budget: int | None = PROMPT_TOKEN_BUDGET, fused: bool = False):
     """
     Orchestrates a multi-step RAG process for more accurate fact-checking.
+
+    token_budget bounds the article + evidence portion of each prompt (None disables
+    the budget). With fused=True, search queries are extracted locally and claim
+    extraction and synthesis share a single LLM call.
     """
-    # 1. Use the LLM to extract key claims first
-    key_claims = _extract_key_claims(article_text)
+    article_budget, evidence_budget = _split_budget(token_budget)
+    prompt_article = _summarize_article(article_text, article_budget)
+
+    # 1. Extract key claims (locally in fused mode, otherwise with the LLM)
+    if fused:
+        key_claims = _extractive_claims(article_text)
+    else:
+        key_claims = _extract_key_claims(prompt_article)
     if not key_claims:
         return "Could not extract verifiable claims from the article."
 
-    # 2. Search the web for each specific claim and aggregate the evidence
+    # 2. Search the web for each specific claim and aggregate the ranked evidence
     print("-> Step 2: Aggregating web evidence for all claims...")
-    aggregated_context = ""
-    for claim in key_claims:
-        aggregated_context += _search_duckduckgo(claim)
+    search_results = [_search_duckduckgo(claim) for claim in key_claims]
+    aggregated_context = _build_evidence_context(key_claims, search_results, evidence_budget)
     
     # 3. Synthesize all gathered evidence into a final report
-    final_report = _synthesize_with_llm(aggregated_context, article_text)
+    if fused:
+        return _extract_and_synthesize_with_llm(aggregated_context, prompt_article)
+    final_report = _synthesize_with_llm(aggregated_context, prompt_article)
     
-    return final_report
\ No newline at end of file
+    return final_report
@@ -0,0 +1,204 @@
+# In file: profile_ingestor.py
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+import pandas as pd
+from models.behavioural_profiler import BehaviouralProfiler
+
+# Streaming ingestion of new messages into the behavioural profiles.
+# Events are JSON lines of the form {"author_id": ..., "text": ..., "timestamp": ...},
+# read from an append-only file or a TCP socket, micro-batched through the profiler's
+# vectorized update path and committed to online_profiles.joblib periodically.
+# While the ingestor runs it should be the only writer of the profile state; start the
+# Flask app with SENTINEL_PROFILE_INGEST=stream so /analyze only reads the profiles.
+
+
+def parse_event(line):
+    """Parses one JSON line into (author_id, text, timestamp); returns None if malformed."""
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    author_id = event.get('author_id') or event.get('authorId')
+    text = event.get('text')
+    if not author_id or not isinstance(text, str):
+        return None
+    timestamp = event.get('timestamp') or pd.Timestamp.now().isoformat()
+    return author_id, text, timestamp
+
+
+class FileTailSource:
+    """Tails an append-only JSONL file, returning only complete lines."""
+    def __init__(self, path, from_end=False, poll_interval=0.2):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._file = None
+        self._from_end = from_end
+        self._partial = ""
+
+    def _open(self):
+        if self._file is None and os.path.exists(self.path):
+            self._file = open(self.path, 'r', encoding='utf-8')
+            if self._from_end:
+                self._file.seek(0, os.SEEK_END)
+
+    def read_lines(self, max_lines, max_wait):
+        lines = []
+        deadline = time.monotonic() + max_wait
+        while len(lines) < max_lines:
+            self._open()
+            chunk = self._file.readline() if self._file else ""
+            if chunk:
+                self._partial += chunk
+                if self._partial.endswith('\n'):
+                    lines.append(self._partial)
+                    self._partial = ""
+                continue
+            if lines or time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+        return lines
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class SocketSource:
+    """Accepts newline-delimited JSON events from any number of TCP clients."""
+    def __init__(self, host, port):
+        self._lines = queue.Queue()
+        lines = self._lines
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw_line in self.rfile:
+                    lines.put(raw_line.decode('utf-8', errors='replace'))
+
+        self._server = socketserver.ThreadingTCPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self.address = self._server.server_address
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def read_lines(self, max_lines, max_wait):
+        lines = []
+        try:
+            lines.append(self._lines.get(timeout=max_wait))
+            while len(lines) < max_lines:
+                lines.append(self._lines.get_nowait())
+        except queue.Empty:
+            pass
+        return lines
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class ProfileIngestor:
+    """
+    Micro-batches events from a source into a BehaviouralProfiler and commits the
+    updated profiles every commit_interval seconds.
+    """
+    def __init__(self, profiler, source, batch_size=256, max_batch_wait=0.5, commit_interval=5.0):
+        self.profiler = profiler
+        self.source = source
+        self.batch_size = batch_size
+        self.max_batch_wait = max_batch_wait
+        self.commit_interval = commit_interval
+        self.stats = {'events': 0, 'malformed': 0, 'batches': 0, 'commits': 0, 'processing_seconds': 0.0}
+        self._dirty = False
+        self._last_commit = time.monotonic()
+
+    def process_batch(self, lines):
+        """Parses and applies one micro-batch of raw lines. Returns the number of events applied."""
+        events = [parse_event(line) for line in lines]
+        valid = [event for event in events if event is not None]
+        self.stats['malformed'] += len(events) - len(valid)
+        if not valid:
+            return 0
+
+        start = time.perf_counter()
+        author_ids, texts, timestamps = zip(*valid)
+        self.profiler.update_profiles_batch(list(author_ids), list(texts), list(timestamps))
+        self.stats['processing_seconds'] += time.perf_counter() - start
+        self.stats['events'] += len(valid)
+        self.stats['batches'] += 1
+        self._dirty = True
+        return len(valid)
+
+    def commit(self):
+        """Saves the profile cache if it has changed since the last commit."""
+        if self._dirty:
+            self.profiler.save_profiles()
+            self.stats['commits'] += 1
+            self._dirty = False
+        self._last_commit = time.monotonic()
+
+    def events_per_second(self):
+        """Ingest throughput, excluding time spent waiting for new events."""
+        if self.stats['processing_seconds'] == 0:
+            return 0.0
+        return self.stats['events'] / self.stats['processing_seconds']
+
+    def run(self, stop_event=None, max_events=None):
+        """Consumes the source until stop_event is set or max_events have been applied."""
+        print("-> Profile ingestor started.")
+        stop_event = stop_event or threading.Event()
+        try:
+            while not stop_event.is_set():
+                if max_events is not None and self.stats['events'] >= max_events:
+                    break
+                lines = self.source.read_lines(self.batch_size, self.max_batch_wait)
+                if lines:
+                    applied = self.process_batch(lines)
+                    print(f"-> Ingested batch of {applied} events "
+                          f"({self.events_per_second():.0f} events/s overall).")
+                if time.monotonic() - self._last_commit >= self.commit_interval:
+                    self.commit()
+        finally:
+            self.commit()
+            print(f"-> Profile ingestor stopped. {self.stats['events']} events in "
+                  f"{self.stats['batches']} batches, {self.stats['malformed']} malformed, "
+                  f"{self.stats['commits']} commits, {self.events_per_second():.0f} events/s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream new messages into the behavioural profiles.")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--file", help="Append-only JSONL file to tail")
+    source_group.add_argument("--socket", help="host:port to accept JSONL events on")
+    parser.add_argument("--from-end", action="store_true", help="Skip events already in the file")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-batch-wait", type=float, default=0.5, help="Seconds to wait for a batch to fill")
+    parser.add_argument("--commit-interval", type=float, default=5.0, help="Seconds between profile saves")
+    parser.add_argument("--history", default="data/twcs.csv")
+    parser.add_argument("--profiles", default="assets/online_profiles.joblib")
+    args = parser.parse_args()
+
+    if args.file:
+        source = FileTailSource(args.file, from_end=args.from_end)
+    else:
+        host, port = args.socket.rsplit(":", 1)
+        source = SocketSource(host, int(port))
+        print(f"-> Listening for events on {source.address[0]}:{source.address[1]}")
+
+    profiler = BehaviouralProfiler(history_data_path=args.history, profile_state_path=args.profiles)
+    ingestor = ProfileIngestor(profiler, source, batch_size=args.batch_size,
+                               max_batch_wait=args.max_batch_wait, commit_interval=args.commit_interval)
+    try:
+        ingestor.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+
+
+if __name__ == "__main__":
+    main()
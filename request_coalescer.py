@@ -0,0 +1,122 @@
+# In file: request_coalescer.py
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+
+class _InFlight:
+    """Holds the outcome of a computation that other callers are waiting on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class RequestCoalescer:
+    """
+    Single-flight coalescing of identical analysis requests. The first caller for a
+    key runs the computation; concurrent callers with the same key wait and share its
+    result, and callers arriving shortly afterwards are served from a short-lived cache.
+    """
+    def __init__(self, ttl_seconds=30.0, max_cache_entries=1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_cache_entries = max_cache_entries
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._cache = {}  # key -> (expires_at, result)
+        self._stats = {'computed': 0, 'coalesced': 0, 'cache_hits': 0, 'errors': 0}
+
+    @staticmethod
+    def make_key(text, media_path="", author_id="", extra=""):
+        """
+        Builds a key from the normalized text, a hash of the media file's contents, its
+        extension and the author, so identical posts map to the same computation. The
+        extension is part of the key, exactly as uploaded, because run_analysis picks the
+        audio or video model from it with case-sensitive checks.
+        """
+        normalized_text = unicodedata.normalize('NFC', text or "")
+        normalized_text = re.sub(r'\s+', ' ', normalized_text).strip()
+
+        media_hash = ""
+        media_suffix = os.path.splitext(media_path)[1] if media_path else ""
+        if media_path:
+            digest = hashlib.sha256()
+            with open(media_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            media_hash = digest.hexdigest()
+
+        key_material = "\x1f".join([normalized_text, media_hash, media_suffix, author_id or "", str(extra)])
+        return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+    def _evict_expired(self, now):
+        expired = [key for key, (expires_at, _) in self._cache.items() if expires_at <= now]
+        for key in expired:
+            del self._cache[key]
+        # Drop the oldest entries if the cache is still over capacity
+        while len(self._cache) > self.max_cache_entries:
+            del self._cache[next(iter(self._cache))]
+
+    def run(self, key, compute, cacheable=None):
+        """
+        Returns compute()'s result for this key, running it at most once across
+        concurrent callers. Errors are propagated to every waiter and never cached.
+        If given, cacheable(result) decides whether a result may be served to later callers.
+        """
+        with self._lock:
+            now = time.monotonic()
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                self._stats['cache_hits'] += 1
+                return cached[1]
+
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self._stats['coalesced'] += 1
+                is_leader = False
+            else:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+                self._stats['computed'] += 1
+                is_leader = True
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                if isinstance(flight.error, Exception):
+                    raise flight.error
+                raise RuntimeError("The coalesced computation was interrupted.")
+            return flight.result
+
+        completed = False
+        try:
+            flight.result = compute()
+            completed = True
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                # Only cache results of computations that returned normally
+                if completed and (cacheable is None or cacheable(flight.result)):
+                    now = time.monotonic()
+                    self._cache.pop(key, None)
+                    self._cache[key] = (now + self.ttl_seconds, flight.result)
+                    self._evict_expired(now)
+            flight.done.set()
+
+        return flight.result
+
+    def get_stats(self):
+        """Returns coalescing counters and the current number of in-flight and cached keys."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._in_flight)
+            stats['cached'] = len(self._cache)
+        return stats
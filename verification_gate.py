@@ -0,0 +1,122 @@
+# In file: verification_gate.py
+import threading
+import time
+from collections import deque
+
+class VerificationGate:
+    """
+    Decides whether an item needs web verification and enforces a per-minute budget
+    on LLM calls and tokens. Items whose provisional score is far inside the Low or
+    High band skip verification entirely; uncertain items are verified while budget
+    remains, then queued (high priority) or degraded (low priority).
+    """
+    # Each verify_with_web run makes two Gemini calls (claim extraction + synthesis)
+    CALLS_PER_VERIFICATION = 2
+    # Expected output size of both calls of one verification, in tokens
+    OUTPUT_TOKENS_PER_VERIFICATION = 600
+
+    def __init__(self, thresholds, uncertainty_band=0.1, max_calls_per_minute=20,
+                 max_tokens_per_minute=60000, queue_min_priority=1, max_queue_wait=10.0):
+        """
+        Initializes the gate around the engine's alert thresholds.
+        """
+        if uncertainty_band < 0:
+            raise ValueError("The uncertainty band must be non-negative")
+
+        self.thresholds = thresholds
+        self.uncertainty_band = uncertainty_band
+        self.max_calls_per_minute = max_calls_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.queue_min_priority = queue_min_priority
+        self.max_queue_wait = max_queue_wait
+
+        self._window = deque()  # (timestamp, calls, tokens) spent in the last 60 seconds
+        self._condition = threading.Condition()
+        self._stats = {
+            'verified': 0,
+            'skipped_confident': 0,
+            'queued': 0,
+            'degraded': 0,
+            'verification_seconds': 0.0,
+        }
+
+    @staticmethod
+    def estimate_tokens(prompt_tokens):
+        """
+        Tokens charged for one verification: the prompt tokens estimated by the web
+        verifier plus the expected output of its LLM calls.
+        """
+        return prompt_tokens + VerificationGate.OUTPUT_TOKENS_PER_VERIFICATION
+
+    def needs_verification(self, provisional_score):
+        """Returns True if the score lies within the uncertainty band around any threshold."""
+        return any(abs(provisional_score - boundary) <= self.uncertainty_band
+                   for boundary in self.thresholds.values())
+
+    def _prune(self, now):
+        while self._window and now - self._window[0][0] >= 60.0:
+            self._window.popleft()
+
+    def _has_budget(self, tokens):
+        # An empty window always admits one item, whatever its size
+        if not self._window:
+            return True
+        calls_used = sum(entry[1] for entry in self._window)
+        tokens_used = sum(entry[2] for entry in self._window)
+        return (calls_used + self.CALLS_PER_VERIFICATION <= self.max_calls_per_minute and
+                tokens_used + tokens <= self.max_tokens_per_minute)
+
+    def acquire(self, tokens, priority=0):
+        """
+        Reserves budget for one verification. Returns 'run', 'queued' (ran after waiting
+        for budget) or 'degraded' (no budget; verification should be skipped).
+        """
+        # An item larger than the whole budget would never fit; count it as a full minute's worth
+        tokens = min(tokens, self.max_tokens_per_minute)
+        waited = False
+        deadline = time.monotonic() + self.max_queue_wait
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                if self._has_budget(tokens):
+                    self._window.append((now, self.CALLS_PER_VERIFICATION, tokens))
+                    if waited:
+                        self._stats['queued'] += 1
+                    return 'queued' if waited else 'run'
+
+                # Low-priority items, or items that have waited too long, are degraded
+                if priority < self.queue_min_priority or now >= deadline:
+                    self._stats['degraded'] += 1
+                    return 'degraded'
+
+                # Wait until the oldest entry leaves the window or the deadline passes
+                oldest = self._window[0][0] if self._window else now
+                waited = True
+                self._condition.wait(timeout=max(min(oldest + 60.0, deadline) - now, 0.01))
+
+    def record_verification(self, seconds):
+        """Records the wall time of a completed verification."""
+        with self._condition:
+            self._stats['verified'] += 1
+            self._stats['verification_seconds'] += seconds
+
+    def record_skip(self):
+        """Records an item that was confident enough to skip verification."""
+        with self._condition:
+            self._stats['skipped_confident'] += 1
+
+    def get_stats(self):
+        """
+        Returns gate counters, including estimated LLM calls and latency saved. Only confident
+        skips count as savings; degraded items are verifications lost to the budget.
+        """
+        with self._condition:
+            stats = dict(self._stats)
+        avg_seconds = stats['verification_seconds'] / stats['verified'] if stats['verified'] else 0.0
+        stats['avg_verification_seconds'] = round(avg_seconds, 3)
+        stats['saved_llm_calls'] = stats['skipped_confident'] * self.CALLS_PER_VERIFICATION
+        stats['saved_latency_seconds'] = round(stats['skipped_confident'] * avg_seconds, 3)
+        stats['lost_verifications'] = stats['degraded']
+        stats['verification_seconds'] = round(stats['verification_seconds'], 3)
+        return stats